@@ -1,41 +1,83 @@
 import requests
+import aiohttp
+import asyncio
+import diskcache
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import ijson
 import json
-import pandas as pd
 import logging
 import sys
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import time
-import re
 import argparse
-
-# Load configuration from config.json
-with open("config.json", "r") as config_file:
-    config = json.load(config_file)
-
-# Assign config values to variables
-SONARR_API_URL = config['SONARR_API_URL']
-SONARR_API_KEY = config['SONARR_API_KEY']
-DEBUG = config['DEBUG']
-max_moves = config['max_moves']
-dry_run = config['dry_run']
-timeout = config['timeout_seconds']  
-valid_root_paths = [path.rstrip('/').lower() for path in config['valid_root_paths']]
-cooldown_days = config['cooldown_days']  # Read cooldown_days from the config
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+from dataclasses import dataclass, replace
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """Serialize an object to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+@dataclass(frozen=True)
+class Config:
+    """Typed, read-only view of config.json."""
+    sonarr_api_url: str
+    sonarr_api_key: str
+    debug: bool
+    max_moves: int
+    dry_run: bool
+    timeout: int
+    valid_root_paths: frozenset
+    cooldown_seconds: int
+
+    @classmethod
+    def from_dict(cls, config):
+        """Build the config from the parsed config.json, normalizing paths and units once."""
+        return cls(
+            sonarr_api_url=config['SONARR_API_URL'],
+            sonarr_api_key=config['SONARR_API_KEY'],
+            debug=config['DEBUG'],
+            max_moves=config['max_moves'],
+            dry_run=config['dry_run'],
+            timeout=config['timeout_seconds'],
+            valid_root_paths=frozenset(path.rstrip('/').lower() for path in config['valid_root_paths']),
+            cooldown_seconds=config['cooldown_days'] * 86400
+        )
+
+# Load config.json once into an immutable, typed object
+with open("config.json", "rb") as config_file:
+    CFG = Config.from_dict(json_loads(config_file.read()))
 
 
 
 # Setup logging to both file and console with UTF-8 encoding
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+logger.setLevel(logging.DEBUG if CFG.debug else logging.INFO)
 
 # Create file handler to log to file
 file_handler = logging.FileHandler('logfile.log', encoding='utf-8')
-file_handler.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+file_handler.setLevel(logging.DEBUG if CFG.debug else logging.INFO)
 
 # Create console handler to log to console
 console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+console_handler.setLevel(logging.DEBUG if CFG.debug else logging.INFO)
 
 # Create formatter and add it to the handlers
 formatter = logging.Formatter('%(asctime)s - %(message)s')
@@ -49,84 +91,148 @@ logger.addHandler(console_handler)
 STATE_FILE = 'move_state.json'
 MOVE_HISTORY_FILE = 'move_history.json'
 
+# Share one keep-alive session for every Sonarr call, retrying transient failures
+SESSION = requests.Session()
+SESSION.headers.update({"X-Api-Key": CFG.sonarr_api_key, "Content-Type": "application/json"})
+# Everything goes to one Sonarr host and the log polling has its own aiohttp pool
+adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=5,
+        # Backs off 0s, 1s, 2s, 4s, 8s between attempts, enough to ride out a Sonarr restart
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "PUT", "POST"])
+    )
+)
+SESSION.mount("http://", adapter)
+SESSION.mount("https://", adapter)
+
+# On-disk cache for Sonarr responses that change slowly between runs
+cache = diskcache.Cache('.sonarr_cache')
+
+def cached_get(url, ttl=60):
+    """GET a Sonarr endpoint, serving the decoded JSON from the disk cache while it is fresh
+    and revalidating it with its ETag once it is stale."""
+    etag = data = None
+    cached = cache.get(url)
+    if cached is not None:
+        fetched_at, etag, data = cached
+        if time.time() - fetched_at < ttl:
+            return data
+    headers = {"If-None-Match": etag} if etag else {}
+    response = SESSION.get(url, headers=headers)
+    # A 304 means the cached body is still current, so skip the download and parse
+    if response.status_code != 304:
+        response.raise_for_status()
+        data = json_loads(response.content)
+        etag = response.headers.get('ETag')
+    cache.set(url, (time.time(), etag, data))
+    return data
+
 def get_free_space_via_api():
     """Get free space for all monitored paths via Sonarr API."""
-    disk_space_endpoint = f"{SONARR_API_URL}/diskspace"
-    headers = {"X-Api-Key": SONARR_API_KEY}
-    
-    response = requests.get(disk_space_endpoint, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    disk_space_endpoint = f"{CFG.sonarr_api_url}/diskspace"
+    return cached_get(disk_space_endpoint, ttl=30)
 
 def get_series_info():
     """Get series information from Sonarr API."""
-    series_endpoint = f"{SONARR_API_URL}/series"
-    headers = {"X-Api-Key": SONARR_API_KEY}
-    
-    series_data = []
+    series_endpoint = f"{CFG.sonarr_api_url}/series"
     
     try:
-        series_response = requests.get(series_endpoint, headers=headers)
-        series_response.raise_for_status()
-        series_list = series_response.json()
+        series_list = cached_get(series_endpoint, ttl=300)
         
+        series_data = []
         for series in series_list:
-            series_id = series['id']
-            title = series['title']
-            path = series['path']
             root_folder_path = series['rootFolderPath'].rstrip('/').lower()
+            # Sonarr already reports the summed size of the episode files per series
+            total_size_bytes = series.get('statistics', {}).get('sizeOnDisk', 0)
             
-            if root_folder_path in valid_root_paths:
-                episode_files_endpoint = f"{SONARR_API_URL}/episodefile?seriesId={series_id}"
-                episode_files_response = requests.get(episode_files_endpoint, headers=headers)
-                episode_files_response.raise_for_status()
-                episode_files = episode_files_response.json()
-                
-                total_size_bytes = sum(episode_file['size'] for episode_file in episode_files)
-                
-                if total_size_bytes > 0:
-                    series_data.append({
-                        'series_id': series_id,
-                        'title': title,
-                        'path': path,
-                        'root_folder_path': root_folder_path,
-                        'total_size_bytes': total_size_bytes
-                    })
-        
-        series_df = pd.DataFrame(series_data)
-        series_df['total_size_gb'] = series_df['total_size_bytes'] / (1024 ** 3)
-        return series_df
+            if root_folder_path in CFG.valid_root_paths and total_size_bytes > 0:
+                series_data.append({
+                    'series_id': series['id'],
+                    'title': series['title'],
+                    'path': series['path'],
+                    'root_folder_path': root_folder_path,
+                    'total_size_bytes': total_size_bytes,
+                    'total_size_gb': total_size_bytes / (1024 ** 3)
+                })
+        return series_data
     
-    except requests.exceptions.RequestException as e:
+    # orjson's decode error is a ValueError, not a RequestException like response.json() raised
+    except (requests.exceptions.RequestException, ValueError) as e:
         logger.error(f"Error querying Sonarr API: {e}")
-        return pd.DataFrame()
+        return []
+
+# Parsed state files keyed by path, together with the mtime they were read at
+_state_cache = {}
 
 def load_state(file_path):
-    """Load the state from a file."""
+    """Load the state from a file, reusing the parsed copy while the file is unchanged."""
     if os.path.exists(file_path):
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        mtime = os.stat(file_path).st_mtime_ns
+        cached = _state_cache.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(file_path, 'rb') as f:
+            state = json_loads(f.read())
+        _state_cache[file_path] = (mtime, state)
+        return state
     return {}
 
-def save_state(state, file_path):
-    """Save the state to a file."""
-    with open(file_path, 'w') as f:
-        json.dump(state, f)
+def save_state(state, file_path, durable=False):
+    """Save the state to a file atomically, fsyncing it first when durable is set."""
+    # A plain open() honours the umask, so the state files keep their usual permissions
+    temp_path = file_path + '.tmp'
+    try:
+        with open(temp_path, 'wb', buffering=1 << 16) as f:
+            f.write(json_dumps(state))
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _state_cache[file_path] = (os.stat(file_path).st_mtime_ns, state)
+
+class StateWriter:
+    """Hold state files in memory and write back only the ones that changed."""
+
+    def __init__(self, *file_paths):
+        self._data = {file_path: load_state(file_path) for file_path in file_paths}
+        self._dirty = set()
+        self._durable = set()
+
+    def __getitem__(self, file_path):
+        return self._data[file_path]
+
+    def mark_dirty(self, file_path, durable=False):
+        """Flag a state file as needing to be written (and optionally fsynced) on the next flush."""
+        self._dirty.add(file_path)
+        if durable:
+            self._durable.add(file_path)
+
+    def flush(self):
+        """Write every dirty state file to disk."""
+        for file_path in sorted(self._dirty):
+            save_state(self._data[file_path], file_path, durable=file_path in self._durable)
+        self._dirty.clear()
+        self._durable.clear()
 
 def move_series(series_id, new_root_path, dry_run=False):
     """Move a series to a new path in Sonarr."""
-    series_endpoint = f"{SONARR_API_URL}/series/{series_id}"
-    headers = {
-        "X-Api-Key": SONARR_API_KEY,
-        "Content-Type": "application/json"
-    }
+    series_endpoint = f"{CFG.sonarr_api_url}/series/{series_id}"
     
     try:
+        # The PUT sends back the whole record, so fetch it fresh to avoid reverting recent edits
         logger.info(f"Fetching current series information for Series ID: {series_id}...")
-        response = requests.get(series_endpoint, headers=headers)
-        logger.debug(f"GET {series_endpoint} - Status Code: {response.status_code}")
+        response = SESSION.get(series_endpoint)
+        logger.debug("GET %s - Status Code: %s", series_endpoint, response.status_code)
         response.raise_for_status()
-        series_info = response.json()
+        series_info = json_loads(response.content)
         old_path = series_info['path']
         new_path = f"{new_root_path}/{os.path.basename(old_path)}"
         series_info['path'] = new_path
@@ -137,57 +243,65 @@ def move_series(series_id, new_root_path, dry_run=False):
             return True
         
         logger.info(f"Updating series path from {old_path} to {new_path} and moving files...")
-        update_response = requests.put(series_endpoint, headers=headers, json=series_info, params={"moveFiles": move_files})
-        logger.debug(f"PUT {series_endpoint} - Status Code: {update_response.status_code}")
+        update_response = SESSION.put(series_endpoint, json=series_info, params={"moveFiles": move_files})
+        logger.debug("PUT %s - Status Code: %s", series_endpoint, update_response.status_code)
         update_response.raise_for_status()
+        # The move changes both the series paths and the free space, so the next run must refetch them
+        cache.delete(f"{CFG.sonarr_api_url}/series")
+        cache.delete(f"{CFG.sonarr_api_url}/diskspace")
         logger.info(f"Series config updated successfully. New path: {series_info['path']}")
         logger.info(f"Sonarr will now move the files, this part may take minutes, hours, days depending how big the series is.")
         
-        command_endpoint = f"{SONARR_API_URL}/command"
+        command_endpoint = f"{CFG.sonarr_api_url}/command"
         rescan_command = {
             "name": "RescanSeries",
             "seriesId": series_id
         }
-        logger.debug(f"Triggering rescan for Series ID: {series_id}...")
-        rescan_response = requests.post(command_endpoint, headers=headers, json=rescan_command)
-        logger.debug(f"POST {command_endpoint} - Status Code: {rescan_response.status_code}")
+        logger.debug("Triggering rescan for Series ID: %s...", series_id)
+        rescan_response = SESSION.post(command_endpoint, json=rescan_command)
+        logger.debug("POST %s - Status Code: %s", command_endpoint, rescan_response.status_code)
         rescan_response.raise_for_status()
         logger.info(f"Monitoring Sonarr Log for completion of file move")
         return True
     
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
         logger.error(f"Error moving series: {e}")
         return False
 
-def update_move_history(series_id, new_root_path, title):
+def update_move_history(move_history, series_id, new_root_path, title):
     """Update move history to avoid ping-ponging."""
-    move_history = load_state(MOVE_HISTORY_FILE)
     move_history[str(series_id)] = {
         "title": title,
         "last_moved_to": new_root_path,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "timestamp_epoch": time.time()
     }
-    save_state(move_history, MOVE_HISTORY_FILE)
 
 
-def should_move_series(series_id, new_root_path):
+def should_move_series(series_id, new_root_path, move_history):
     """Determine if the series should be moved, considering history."""
-    move_history = load_state(MOVE_HISTORY_FILE)
     if str(series_id) in move_history:
         last_move = move_history[str(series_id)]
         if last_move['last_moved_to'] == new_root_path:
             logger.info(f"Skipping move for Series ID: {series_id} as it was recently moved to {new_root_path}")
             return False
-        last_move_date = datetime.fromisoformat(last_move['timestamp'])
-        if datetime.now() - last_move_date < timedelta(days=cooldown_days):
+        # Entries written before timestamp_epoch existed only carry the ISO timestamp
+        last_move_epoch = last_move.get('timestamp_epoch')
+        if last_move_epoch is None:
+            last_move_epoch = datetime.fromisoformat(last_move['timestamp']).timestamp()
+        if time.time() - last_move_epoch < CFG.cooldown_seconds:
             logger.info(f"Skipping move for Series ID: {series_id} due to cooldown period.")
             return False
     return True
 
 def perform_moves(recommendations, max_moves, dry_run=False):
     """Perform the recommended moves."""
-    state = load_state(STATE_FILE)
+    writer = StateWriter(STATE_FILE, MOVE_HISTORY_FILE)
+    atexit.register(writer.flush)
+    state = writer[STATE_FILE]
+    move_history = writer[MOVE_HISTORY_FILE]
     moves_completed = 0
+    pending_moves = []
 
     for rec in recommendations:
         if moves_completed >= max_moves:
@@ -198,33 +312,47 @@ def perform_moves(recommendations, max_moves, dry_run=False):
         current_path = rec['path']
         title = rec['title']
 
-        if should_move_series(series_id, new_root_path):
+        if should_move_series(series_id, new_root_path, move_history):
             success = move_series(series_id, new_root_path, dry_run)
             if success:
                 logger.info(f"Series '{title}' (ID: {series_id}) successfully moved to {new_root_path}.")
                 state[str(series_id)] = new_root_path
-                save_state(state, STATE_FILE)
-                update_move_history(series_id, new_root_path, title)
+                update_move_history(move_history, series_id, new_root_path, title)
+                # Only a real move has to survive a crash, the history is informational
+                writer.mark_dirty(STATE_FILE, durable=not dry_run)
+                writer.mark_dirty(MOVE_HISTORY_FILE)
+                # Persist both files together before the potentially long wait on Sonarr
+                writer.flush()
                 moves_completed += 1
 
                 expected_path = f"{new_root_path}/{os.path.basename(current_path)}"
-                monitor_sonarr_logs(series_id, expected_path)
+                pending_moves.append((series_id, expected_path))
             else:
                 logger.warning(f"Failed to move Series '{title}' (ID: {series_id}). Not adding to state file.")
         else:
             logger.info(f"Series '{title}' (ID: {series_id}) not eligible for move based on should_move_series check.")
+
+    # Sonarr moves the files server-side, so issue every move first and then watch them together
+    if pending_moves:
+        asyncio.run(monitor_sonarr_logs(pending_moves))
     logger.info(f"Completed {moves_completed} moves out of {max_moves} requested. The script will now exit.")
 
 def print_move_history(json_file):
     """Prints the move history from a JSON file in a human-readable format."""
+    # load_state treats a missing file as empty history, so report it here instead
+    if not os.path.exists(json_file):
+        print(f"Error: The file {json_file} was not found.")
+        return
     try:
-        with open(json_file, 'r') as file:
-            move_history = json.load(file)
-
-        print("Move History:")
-        print("=" * 40)
-        for series_id, path in move_history.items():
-            print(f"Series ID: {series_id} -> Moved to: {path}")
+        # Read through the mtime-keyed state cache so perform_moves reuses this parse
+        move_history = load_state(json_file)
+
+        lines = ["Move History:", "=" * 40]
+        lines.extend(
+            f"Series ID: {series_id} ({entry['title']}) -> Moved to: {entry['last_moved_to']} at {entry['timestamp']}"
+            for series_id, entry in move_history.items()
+        )
+        print("\n".join(lines))
     
     except FileNotFoundError:
         print(f"Error: The file {json_file} was not found.")
@@ -234,141 +362,195 @@ def print_move_history(json_file):
         print(f"An unexpected error occurred: {e}")
 
 
-def report_free_space_heuristically(series_df, disk_spaces, recommendations_file="recommendations.txt"):
-    """Report the free space across drives assuming unlimited moves without making any changes."""
-    # Filter disk spaces to include only valid root paths
-    disk_space_df = pd.DataFrame(disk_spaces).apply(lambda x: x.str.rstrip('/') if x.dtype == "object" else x)
-    disk_space_df = disk_space_df.set_index('path')
-    disk_space_df = disk_space_df[disk_space_df.index.isin(valid_root_paths)]
-
-    # Calculate initial free space
-    initial_free_space = disk_space_df['freeSpace'] / (1024 ** 3)
-    final_free_space = initial_free_space.copy()
-
-    # Sort series by size (smallest first)
-    series_df = series_df.sort_values(by='total_size_gb', ascending=True)
-
-    recommendations = []
-    
-    for index, row in series_df.iterrows():
-        best_drive = final_free_space.idxmax()
-        if row['root_folder_path'] != best_drive:
-            size_gb = row['total_size_gb']
-            final_free_space[row['root_folder_path']] += size_gb
-            final_free_space[best_drive] -= size_gb
-            recommendations.append({
-                'series_id': row['series_id'],
-                'title': row['title'],
-                'current_root': row['root_folder_path'],
-                'recommended_root': best_drive,
-                'path': row['path'],
-                'size_gb': size_gb
-            })
+def _free_space_by_path(disk_spaces):
+    """Map each normalized valid root path to its free space in GB."""
+    free_space = {}
+    for disk in disk_spaces:
+        path = disk['path'].rstrip('/')
+        if path in CFG.valid_root_paths:
+            free_space[path] = disk['freeSpace'] / (1024 ** 3)
+    return free_space
+
+def _move_free_space(heap, free_space, source, target, size_gb):
+    """Shift size_gb from the target drive to the source drive and update the heap to match."""
+    free_space[source] += size_gb
+    free_space[target] -= size_gb
+    # The target is the current top of the heap, so its entry can be replaced in place
+    heapq.heapreplace(heap, (-free_space[target], target))
+    heapq.heappush(heap, (-free_space[source], source))
+
+def _best_drive(heap, free_space):
+    """Return the drive with the most free space, discarding stale heap entries."""
+    while -heap[0][0] != free_space[heap[0][1]]:
+        heapq.heappop(heap)
+    return heap[0][1]
+
+def _improves_balance(free_space, source, target, size_gb):
+    """Return True if moving size_gb from source to target still leaves target with more free space."""
+    return free_space[target] - size_gb > free_space[source] + size_gb
+
+def _plan_moves(series, free_space):
+    """Yield (row, target) for every series worth moving to the drive with the most free space.
+
+    series must be sorted by size (smallest first); free_space is updated as each move is planned.
+    """
+    heap = [(-free, path) for path, free in free_space.items()]
+    heapq.heapify(heap)
+    # Drives whose series can no longer improve the balance, until the next move changes it
+    blocked_sources = set()
+
+    for row in series:
+        best_drive = _best_drive(heap, free_space)
+        source = row['root_folder_path']
+        if source == best_drive or source in blocked_sources:
+            continue
+        size_gb = row['total_size_gb']
+        if not _improves_balance(free_space, source, best_drive, size_gb):
+            # Later series on this drive are at least as large, so they would overshoot too
+            blocked_sources.add(source)
+            if len(blocked_sources) == len(free_space) - 1:
+                return
+            continue
+        _move_free_space(heap, free_space, source, best_drive, size_gb)
+        blocked_sources.clear()
+        yield row, best_drive
+
+def _print_free_space_table(free_space):
+    """Print free space per path as a two-column table."""
+    width = max((len(path) for path in free_space), default=0)
+    lines = [f"{'':<{width}}  Free Space (GB)"]
+    lines.extend(f"{path:<{width}}  {free:>15.6f}" for path, free in free_space.items())
+    print("\n".join(lines))
+
+def report_free_space_heuristically(series, free_space, recommendations_file="recommendations.txt"):
+    """Report the free space across drives assuming unlimited moves without making any changes.
+
+    series must already be sorted by size (smallest first).
+    """
+    initial_free_space = free_space
+    final_free_space = dict(initial_free_space)
+
+    # The recommendations are only written out, so format each line as it is found
+    recommendation_lines = [
+        f"Series ID: {row['series_id']}, Title: {row['title']}, "
+        f"Current Path: {row['root_folder_path']}, Recommended Path: {target}, "
+        f"Size (GB): {row['total_size_gb']:.2f}\n"
+        for row, target in _plan_moves(series, final_free_space)
+    ]
 
     # Write recommendations to a file
     with open(recommendations_file, 'w', encoding='utf-8') as f:
-        f.write(f"Number of potential recommendations: {len(recommendations)}\n\n")
+        f.write(f"Number of potential recommendations: {len(recommendation_lines)}\n\n")
         f.write("Recommendations:\n")
-        for rec in recommendations:
-            f.write(f"Series ID: {rec['series_id']}, Title: {rec['title']}, "
-                    f"Current Path: {rec['current_root']}, Recommended Path: {rec['recommended_root']}, "
-                    f"Size (GB): {rec['size_gb']:.2f}\n")
+        f.write("".join(recommendation_lines))
 
-    # Ensure the paths are in the same order
-    ordered_paths = initial_free_space.index
-
-    # Print current free space as a table
+    # Print current free space as a table (both dicts share the same path order)
     print("Current free space (in GB) for valid paths:")
-    print(initial_free_space.loc[ordered_paths].to_frame(name='Free Space (GB)').to_string(index=True, header=True))
+    _print_free_space_table(initial_free_space)
 
     # Print predicted free space as a table
     print("\nPredicted free space (in GB) after all potential moves:")
-    print(final_free_space.loc[ordered_paths].to_frame(name='Free Space (GB)').to_string(index=True, header=True))
+    _print_free_space_table(final_free_space)
     
-def balance_free_space_heuristically(series_df, disk_spaces, dry_run=False):
-    """Balance free space across drives using a heuristic approach."""
-    disk_space_df = pd.DataFrame(disk_spaces).apply(lambda x: x.str.rstrip('/') if x.dtype == "object" else x)
-    disk_space_df = disk_space_df.set_index('path')
-
-    initial_free_space = disk_space_df['freeSpace'] / (1024 ** 3)
-    final_free_space = initial_free_space.copy()
+def balance_free_space_heuristically(series, free_space, dry_run=False):
+    """Balance free space across drives using a heuristic approach.
 
-    series_df = series_df.sort_values(by='total_size_gb', ascending=True)
+    series must already be sorted by size (smallest first).
+    """
+    final_free_space = dict(free_space)
 
     # Load the state to filter out series that have already been moved
     state = load_state(STATE_FILE)
 
+    def unmoved_series():
+        """Yield the series not yet present in the state file."""
+        for row in series:
+            if str(row['series_id']) in state:
+                logger.debug("Skipping recommendation for Series ID: %s as it is already in the state file.", row['series_id'])
+                continue
+            yield row
+
     recommendations = []
     total_size_to_move_gb = 0  # Initialize total size to be moved
     moves_count = 0
 
-    for _, row in series_df.iterrows():
-        if moves_count >= max_moves:
+    for row, target in _plan_moves(unmoved_series(), final_free_space):
+        if moves_count >= CFG.max_moves:
             break
 
-        series_id = row['series_id']
-
-        # Skip series already present in the state file
-        if str(series_id) in state:
-            logger.debug(f"Skipping recommendation for Series ID: {series_id} as it is already in the state file.")
-            continue
-
-        best_drive = final_free_space.idxmax()
-        if row['root_folder_path'] != best_drive:
-            size_gb = row['total_size_gb']
-            final_free_space[row['root_folder_path']] += size_gb
-            final_free_space[best_drive] -= size_gb
-            recommendations.append({
-                'series_id': row['series_id'],
-                'title': row['title'],
-                'current_root': row['root_folder_path'],
-                'recommended_root': best_drive,
-                'path': row['path'],
-                'size_gb': size_gb
-            })
-            total_size_to_move_gb += size_gb  # Add to the total size to be moved
-            moves_count += 1
+        size_gb = row['total_size_gb']
+        recommendations.append({
+            'series_id': row['series_id'],
+            'title': row['title'],
+            'current_root': row['root_folder_path'],
+            'recommended_root': target,
+            'path': row['path'],
+            'size_gb': size_gb
+        })
+        total_size_to_move_gb += size_gb  # Add to the total size to be moved
+        moves_count += 1
 
     # Log the total size to be moved
     logging.info(f"Total size to be moved: {total_size_to_move_gb:.2f} GB across {moves_count} series")
 
     # Perform the moves
-    perform_moves(recommendations, max_moves, dry_run)
+    perform_moves(recommendations, CFG.max_moves, dry_run)
 
-def monitor_sonarr_logs(series_id, expected_path, poll_interval=3):
-    """Monitor Sonarr logs for successful move completion."""
-    if dry_run:
-        logger.info(f"Dry-run: Skipping Sonarr log monitoring for Series ID: {series_id} to {expected_path}.")
+async def monitor_sonarr_logs(pending_moves, poll_interval=3):
+    """Monitor Sonarr logs for successful completion of every pending (series_id, expected_path) move."""
+    if CFG.dry_run:
+        for series_id, expected_path in pending_moves:
+            logger.info(f"Dry-run: Skipping Sonarr log monitoring for Series ID: {series_id} to {expected_path}.")
         return True
 
-    log_endpoint = f"{SONARR_API_URL}/log"
-    headers = {"X-Api-Key": SONARR_API_KEY}
+    log_endpoint = f"{CFG.sonarr_api_url}/log"
+    # Only the newest records can contain the move confirmation
+    log_params = {"page": 1, "pageSize": 50, "sortKey": "time", "sortDirection": "descending"}
     
+    # One poll of /log serves every move that is still waiting for its confirmation
+    needles = {
+        series_id: (expected_path, f"moved successfully to {expected_path}".lower())
+        for series_id, expected_path in pending_moves
+    }
     start_time = datetime.now(timezone.utc)
+    last_etag = None
     
-    while (datetime.now(timezone.utc) - start_time).total_seconds() < timeout:
-        try:
-            response = requests.get(log_endpoint, headers=headers)
-            response.raise_for_status()
-            logs_data = response.json()
-
-            pattern = re.compile(rf"moved successfully to {re.escape(expected_path)}", re.IGNORECASE)
-            for log_entry in logs_data.get('records', []):
-                if pattern.search(log_entry.get('message', '')):
-                    logger.info(f"Sonarr Log: {log_entry['message']} for Series ID: {series_id}")
-                    return True
-
-            time.sleep(poll_interval)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error querying Sonarr logs for Series ID: {series_id}, Expected Path: {expected_path}: {e}")
-            time.sleep(poll_interval)
+    async with aiohttp.ClientSession(headers={"X-Api-Key": CFG.sonarr_api_key}) as session:
+        while needles and (datetime.now(timezone.utc) - start_time).total_seconds() < CFG.timeout:
+            try:
+                headers = {"If-None-Match": last_etag} if last_etag else {}
+                async with session.get(log_endpoint, headers=headers, params=log_params) as response:
+                    # A 304 means the log is unchanged since the last poll, nothing new to scan
+                    if response.status != 304:
+                        response.raise_for_status()
+                        # Stream only the record messages off the socket and stop once every move is confirmed
+                        async for message in ijson.items(response.content, 'records.item.message'):
+                            if not message:
+                                continue
+                            # Sonarr ends the message with the path, so a substring match would also
+                            # accept a sibling folder sharing the prefix (e.g. "Show" vs "Show Two")
+                            message_lower = message.rstrip().lower()
+                            for series_id, (expected_path, needle) in list(needles.items()):
+                                if message_lower.endswith(needle):
+                                    logger.info(f"Sonarr Log: {message} for Series ID: {series_id}")
+                                    del needles[series_id]
+                            if not needles:
+                                break
+                        last_etag = response.headers.get('ETag', last_etag)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ijson.JSONError) as e:
+                series_ids = ", ".join(str(series_id) for series_id in needles)
+                logger.error(f"Error querying Sonarr logs for Series IDs: {series_ids}: {e}")
+            
+            if needles:
+                await asyncio.sleep(poll_interval)
     
-    logger.error(f"Timeout reached: Sonarr did not log a successful move for Series ID: {series_id} to {expected_path}.")
-    return False
+    for series_id, (expected_path, _) in needles.items():
+        logger.error(f"Timeout reached: Sonarr did not log a successful move for Series ID: {series_id} to {expected_path}.")
+    return not needles
 
 def validate_config():
     """Validate critical configuration parameters."""
-    if not SONARR_API_URL or not SONARR_API_KEY:
+    if not CFG.sonarr_api_url or not CFG.sonarr_api_key:
         logger.error("Critical configuration missing: SONARR_API_URL and SONARR_API_KEY must be set.")
         sys.exit(1)
         
@@ -382,31 +564,34 @@ if __name__ == "__main__":
 
     # Override config values if provided via command line
     if args.dry_run:
-        dry_run = True
+        CFG = replace(CFG, dry_run=True)
     if args.max_moves:
-        max_moves = args.max_moves
+        CFG = replace(CFG, max_moves=args.max_moves)
 
     # Validate configuration before proceeding
     validate_config()
 
     # Call the function with the path to your move history JSON file
     logger.info("Printing a list of historic moves.")
-    print_move_history('move_history.json')
-
-    # Fetch series info
-    series_df = get_series_info()
-    
-    # Fetch disk space info
-    disk_spaces = get_free_space_via_api()
+    print_move_history(MOVE_HISTORY_FILE)
+
+    # Fetch series info and disk space info concurrently, they are independent
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        series_future = executor.submit(get_series_info)
+        disk_spaces_future = executor.submit(get_free_space_via_api)
+        series = series_future.result()
+        disk_spaces = disk_spaces_future.result()
     
-    # Report free space heuristically with unlimited moves
-    if not series_df.empty:
-        report_free_space_heuristically(series_df, disk_spaces)
-    else:
-        logger.info("No valid data available for reporting.")
+    if series:
+        # Sort the series (smallest first) and map the free space once for both passes
+        series.sort(key=itemgetter('total_size_gb'))
+        free_space = _free_space_by_path(disk_spaces)
 
-    # Balance free space heuristically and perform moves
-    if not series_df.empty:
-        balance_free_space_heuristically(series_df, disk_spaces, dry_run=dry_run)
+        # Report free space heuristically with unlimited moves
+        report_free_space_heuristically(series, free_space)
+
+        # Balance free space heuristically and perform moves
+        balance_free_space_heuristically(series, free_space, dry_run=CFG.dry_run)
     else:
+        logger.info("No valid data available for reporting.")
         logger.info("No valid data available for moving series.")
\ No newline at end of file